@@ -1,146 +1,251 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from typing import Dict, Any
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
+import functools
+import glob
+import hashlib
 import os
+import pickle
+import tempfile
 import logging
 import yaml
 
+# Prefer the libyaml-backed loader; fall back to the pure-Python one
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
-@CrewBase
-class AgentsAi():
-    """AgentsAi crew for generating quiz questions"""
 
-    # Get the directory of the current file
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Construct the correct paths to the YAML files
-    agents_config_path = os.path.join(current_dir, 'agents_nahj.yaml')
-    tasks_config_path = os.path.join(current_dir, 'tasks_nahj.yaml')
-    
-    logger.debug(f"Agent config path: {agents_config_path}")
-    logger.debug(f"Tasks config path: {tasks_config_path}")
-    
-    # Load configurations manually since yaml_loader isn't available
+def _load_with_sidecar(path: str, raw: bytes, digest: bytes) -> Any:
+    """Parse YAML bytes through a pickled sidecar named after their digest.
+
+    ``config_nahj.yaml`` whose content hashes to ``ab12...`` is cached as
+    ``config_nahj.ab12....pkl``, so an edited file simply misses and gets a
+    new sidecar; stale ones for the same file are removed. A sidecar that
+    can't be read for any reason is treated as a miss, and failing to write
+    one (e.g. read-only deploy) is not an error. Writes go through a temp
+    file and os.replace(), so workers starting together never see a
+    half-written sidecar.
+    """
+    stem = os.path.splitext(path)[0]
+    sidecar = f"{stem}.{digest.hex()}.pkl"
     try:
-        with open(agents_config_path, 'r') as f:
-            agents_config = yaml.safe_load(f)
-        with open(tasks_config_path, 'r') as f:
-            tasks_config = yaml.safe_load(f)
-        logger.info("Successfully loaded YAML configurations")
+        with open(sidecar, 'rb') as f:
+            return pickle.loads(f.read())
+    except FileNotFoundError:
+        pass
     except Exception as e:
-        logger.error(f"Error loading YAML configurations: {str(e)}")
-        # Default configuration fallback
-        agents_config = {
-            'researcher': {
-                'role': 'Educational Content Analyst',
-                'goal': 'Analyze lecture and course materials to identify key concepts and learning objectives',
-                'backstory': 'An expert in curriculum analysis who can quickly identify the most important learning points from educational content.',
-                'tools': [],
-                'allow_delegation': False
-            },
-            'question_writer': {
-                'role': 'Quiz Question Writer',
-                'goal': 'Create 5 insightful questions about the lecture content that test understanding',
-                'backstory': 'A professional educator with years of experience creating effective assessment questions for university courses.',
-                'tools': [],
-                'allow_delegation': False
-            }
-        }
-        
-        tasks_config = {
-            'research_task': {
-                'name': 'Analyze Lecture Content',
-                'description': 'Analyze this educational content:\nCourse: {course_name}\nLecture: {lecture_title}\nIdentify the 5 most important concepts students should understand.',
-                'expected_output': 'A markdown list of 5 key concepts with brief explanations of their importance.',
-                'agent': 'researcher'
-            },
-            'question_task': {
-                'name': 'Generate Quiz Questions',
-                'description': 'Using the key concepts identified in the research task, create 5 assessment questions that:\n1. Cover different cognitive levels (remember, understand, apply, analyze, evaluate)\n2. Are clear and unambiguous\n3. Test genuine understanding of the material\n4. Are appropriate for university-level students',
-                'expected_output': 'A JSON array containing 5 well-formulated questions about the lecture content.\nFormat: ["question1", "question2", ...]',
-                'agent': 'question_writer'
-            }
-        }
+        logger.warning("Ignoring unreadable YAML sidecar %s: %s", sidecar, e)
+
+    data = yaml.load(raw, Loader=_SafeLoader)
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(sidecar), prefix='.yaml-sidecar-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(data, f, protocol=5)
+            os.replace(tmp, sidecar)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        for stale in glob.glob(glob.escape(stem) + '.*.pkl'):
+            if stale != sidecar:
+                os.remove(stale)
+    except OSError as e:
+        logger.debug("Could not write YAML sidecar %s: %s", sidecar, e)
+    return data
+
+
+def _load_yaml(path: str) -> Any:
+    """Load a YAML file through its content-addressed sidecar.
+
+    The sidecar is keyed by a digest of the file's bytes rather than its
+    mtime, which survives ``cp -p`` and image rebuilds.
+    """
+    # Read the raw bytes in one go; the loader decodes them itself
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return _load_with_sidecar(path, raw, hashlib.blake2b(raw, digest_size=8).digest())
+
+
+# Get the directory of the current file (__file__ is usually already absolute)
+_HERE = os.path.dirname(__file__) if os.path.isabs(__file__) else os.path.dirname(os.path.abspath(__file__))
+
+# The crew config lives one level up, next to main.py
+_CONFIG_YAML = os.path.join(os.path.dirname(_HERE), 'config_nahj.yaml')
+
+# Default configuration fallback, read-only so cached lookups can't be mutated
+_FALLBACK_AGENTS_CONFIG: Mapping[str, Any] = MappingProxyType({
+    'researcher': MappingProxyType({
+        'role': 'Educational Content Analyst',
+        'goal': 'Analyze lecture and course materials to identify key concepts and learning objectives',
+        'backstory': 'An expert in curriculum analysis who can quickly identify the most important learning points from educational content.',
+        'tools': (),
+        'allow_delegation': False
+    }),
+    'question_writer': MappingProxyType({
+        'role': 'Quiz Question Writer',
+        'goal': 'Create 5 insightful questions about the lecture content that test understanding',
+        'backstory': 'A professional educator with years of experience creating effective assessment questions for university courses.',
+        'tools': (),
+        'allow_delegation': False
+    })
+})
+
+_FALLBACK_TASKS_CONFIG: Mapping[str, Any] = MappingProxyType({
+    'research_task': MappingProxyType({
+        'name': 'Analyze Lecture Content',
+        'description': 'Analyze this educational content:\nCourse: {course_name}\nLecture: {lecture_title}\nIdentify the 5 most important concepts students should understand.',
+        'expected_output': 'A markdown list of 5 key concepts with brief explanations of their importance.',
+        'agent': 'researcher'
+    }),
+    'question_task': MappingProxyType({
+        'name': 'Generate Quiz Questions',
+        'description': 'Using the key concepts identified in the research task, create 5 assessment questions that:\n1. Cover different cognitive levels (remember, understand, apply, analyze, evaluate)\n2. Are clear and unambiguous\n3. Test genuine understanding of the material\n4. Are appropriate for university-level students',
+        'expected_output': 'A JSON array containing 5 well-formulated questions about the lecture content.\nFormat: ["question1", "question2", ...]',
+        'agent': 'question_writer'
+    })
+})
+
+
+# Per-agent/task defaults used when a loaded config is missing an entry
+_DEFAULT_AGENTS: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    'researcher': MappingProxyType({
+        'role': "Educational Content Analyst",
+        'goal': "Analyze lecture and course materials to identify key concepts",
+        'backstory': "An expert in curriculum analysis who can identify important learning points."
+    }),
+    'question_writer': MappingProxyType({
+        'role': "Quiz Question Writer",
+        'goal': "Create 5 insightful questions about the lecture content",
+        'backstory': "A professional educator with experience creating assessment questions."
+    })
+})
+
+_DEFAULT_TASKS: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    'research_task': MappingProxyType({
+        'description': "Analyze this educational content:\nCourse: {course_name}\nLecture: {lecture_title}\nIdentify the 5 most important concepts students should understand.",
+        'expected_output': "A markdown list of 5 key concepts with brief explanations of their importance."
+    }),
+    'question_task': MappingProxyType({
+        'description': "Using the key concepts identified in the research task, create 5 assessment questions that test understanding of the material.",
+        'expected_output': "A JSON array containing 5 well-formulated questions about the lecture content.\nFormat: [\"question1\", \"question2\", ...]"
+    })
+})
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config() -> tuple[Mapping[str, Any] | None, Mapping[str, Any] | None]:
+    """Parse the crew YAML on first use, falling back to the built-in config.
+
+    Returns an ``(agents_config, tasks_config)`` pair.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Crew config path: %s", _CONFIG_YAML)
+    if not os.path.isfile(_CONFIG_YAML):
+        logger.error("YAML configuration not found: %s", _CONFIG_YAML)
         logger.warning("Using fallback configuration")
+        return _FALLBACK_AGENTS_CONFIG, _FALLBACK_TASKS_CONFIG
+
+    try:
+        config = _load_yaml(_CONFIG_YAML)
+    except yaml.YAMLError as e:
+        logger.error("Error loading YAML configuration: %s", e)
+        logger.warning("Using fallback configuration")
+        return _FALLBACK_AGENTS_CONFIG, _FALLBACK_TASKS_CONFIG
+
+    logger.info("Successfully loaded YAML configuration")
+    # Missing sections are covered by the per-entry defaults
+    config = config or {}
+    return config.get('agents'), config.get('tasks')
+
+
+def _load_agents_config() -> Mapping[str, Any] | None:
+    return _load_config()[0]
+
+
+def _load_tasks_config() -> Mapping[str, Any] | None:
+    return _load_config()[1]
+
+
+@dataclass(frozen=True, slots=True)
+class AgentCfg:
+    role: str
+    goal: str
+    backstory: str
+
+
+@dataclass(frozen=True, slots=True)
+class TaskCfg:
+    description: str
+    expected_output: str
+
+
+@functools.lru_cache(maxsize=None)
+def _agent_cfg(name: str) -> AgentCfg:
+    """Flatten one agent's config entry into an AgentCfg, built once per name."""
+    cfg = (_load_agents_config() or _DEFAULT_AGENTS).get(name, _DEFAULT_AGENTS[name])
+    return AgentCfg(role=cfg['role'], goal=cfg['goal'], backstory=cfg['backstory'])
+
+
+@functools.lru_cache(maxsize=None)
+def _task_cfg(name: str) -> TaskCfg:
+    """Flatten one task's config entry into a TaskCfg, built once per name."""
+    cfg = (_load_tasks_config() or _DEFAULT_TASKS).get(name, _DEFAULT_TASKS[name])
+    return TaskCfg(description=cfg['description'], expected_output=cfg['expected_output'])
+
+
+@CrewBase
+class AgentsAi():
+    """AgentsAi crew for generating quiz questions"""
+
+    # crewai memoizes @agent, @task and @crew methods per instance, so crew()
+    # and the task wiring share the same objects
 
     @agent
     def researcher(self) -> Agent:
-        try:
-            return Agent(
-                role=self.agents_config['researcher']['role'],
-                goal=self.agents_config['researcher']['goal'],
-                backstory=self.agents_config['researcher']['backstory'],
-                verbose=True
-            )
-        except Exception as e:
-            logger.error(f"Error creating researcher agent: {str(e)}")
-            # Fallback to hardcoded values if there's an error
-            return Agent(
-                role="Educational Content Analyst",
-                goal="Analyze lecture and course materials to identify key concepts",
-                backstory="An expert in curriculum analysis who can identify important learning points.",
-                verbose=True
-            )
+        c = _agent_cfg('researcher')
+        return Agent(
+            role=c.role,
+            goal=c.goal,
+            backstory=c.backstory,
+            verbose=True
+        )
 
     @agent
     def question_writer(self) -> Agent:
-        try:
-            return Agent(
-                role=self.agents_config['question_writer']['role'],
-                goal=self.agents_config['question_writer']['goal'],
-                backstory=self.agents_config['question_writer']['backstory'],
-                verbose=True
-            )
-        except Exception as e:
-            logger.error(f"Error creating question_writer agent: {str(e)}")
-            # Fallback to hardcoded values if there's an error
-            return Agent(
-                role="Quiz Question Writer",
-                goal="Create 5 insightful questions about the lecture content",
-                backstory="A professional educator with experience creating assessment questions.",
-                verbose=True
-            )
+        c = _agent_cfg('question_writer')
+        return Agent(
+            role=c.role,
+            goal=c.goal,
+            backstory=c.backstory,
+            verbose=True
+        )
 
     @task
     def research_task(self) -> Task:
-        try:
-            return Task(
-                description=self.tasks_config['research_task']['description'],
-                expected_output=self.tasks_config['research_task']['expected_output'],
-                agent=self.researcher(),
-                output_file='key_concepts.md'
-            )
-        except Exception as e:
-            logger.error(f"Error creating research task: {str(e)}")
-            # Fallback to hardcoded values if there's an error
-            return Task(
-                description="Analyze this educational content:\nCourse: {course_name}\nLecture: {lecture_title}\nIdentify the 5 most important concepts students should understand.",
-                expected_output="A markdown list of 5 key concepts with brief explanations of their importance.",
-                agent=self.researcher(),
-                output_file='key_concepts.md'
-            )
+        c = _task_cfg('research_task')
+        return Task(
+            description=c.description,
+            expected_output=c.expected_output,
+            agent=self.researcher(),
+            output_file='key_concepts.md'
+        )
 
     @task
     def question_task(self) -> Task:
-        try:
-            return Task(
-                description=self.tasks_config['question_task']['description'],
-                expected_output=self.tasks_config['question_task']['expected_output'],
-                agent=self.question_writer(),
-                output_file='quiz_questions.json',
-                context=[self.research_task()]
-            )
-        except Exception as e:
-            logger.error(f"Error creating question task: {str(e)}")
-            # Fallback to hardcoded values if there's an error
-            return Task(
-                description="Using the key concepts identified in the research task, create 5 assessment questions that test understanding of the material.",
-                expected_output="A JSON array containing 5 well-formulated questions about the lecture content.\nFormat: [\"question1\", \"question2\", ...]",
-                agent=self.question_writer(),
-                output_file='quiz_questions.json',
-                context=[self.research_task()]
-            )
+        c = _task_cfg('question_task')
+        return Task(
+            description=c.description,
+            expected_output=c.expected_output,
+            agent=self.question_writer(),
+            output_file='quiz_questions.json',
+            context=[self.research_task()]
+        )
 
     @crew
     def crew(self) -> Crew:
@@ -153,5 +258,16 @@ class AgentsAi():
                 verbose=True
             )
         except Exception as e:
-            logger.error(f"Error creating crew: {str(e)}")
-            raise
\ No newline at end of file
+            logger.error("Error creating crew: %s", e)
+            raise
+
+
+@functools.lru_cache(maxsize=1)
+def get_crew() -> Crew:
+    """Return the process-wide quiz generation crew, building it on first call.
+
+    The crew only holds static config, so it is shared across requests. Pass
+    per-request values through ``crew.kickoff(inputs=...)`` and don't mutate
+    the returned object.
+    """
+    return AgentsAi().crew()
@@ -3,24 +3,57 @@ import os
 os.environ["CREWAI_TELEMETRY"] = "disabled"
 os.environ["OTEL_SDK_DISABLED"] = "true"
 import sys
+import functools
 import warnings
 import traceback
+import time
 import re
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, Request
-import json
+import orjson
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+import msgspec
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Optional: pyahocorasick speeds up keyword matching in answer analysis
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Configure logging (set LOG_LEVEL=DEBUG for verbose crew output)
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
-app = FastAPI()
+# Patterns for pulling a JSON array out of free-form crew output
+_BRACKETS_RE = re.compile(r'\[(.*)\]', re.DOTALL)
+_BRACKETS_SUB_RE = re.compile(r'.*?\[(.*)\].*', re.DOTALL)
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the shared crew before serving so the first quiz request doesn't pay for it."""
+    try:
+        await run_in_threadpool(get_crew)
+        logger.info("Crew warmed up")
+    except Exception as e:
+        # get_crew() doesn't cache failures, so the first request will retry
+        logger.warning(f"Crew warmup failed: {str(e)}")
+    yield
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Configure CORS - Make sure this is correctly set up
 app.add_middleware(
@@ -31,10 +64,139 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class LectureRequest(BaseModel):
+# Compress larger bodies (question lists, error tracebacks) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
+# Request bodies only hold strings and lists of strings, so they can't form
+# reference cycles and don't need to be tracked by the garbage collector
+class LectureRequest(msgspec.Struct, gc=False):
     lecture_title: str
     course_name: str
 
+def _invalid_body(error: msgspec.DecodeError) -> ORJSONResponse:
+    """422 response for a request body that failed msgspec decoding/validation."""
+    return ORJSONResponse(status_code=422, content={"detail": str(error)})
+
+# 500 bodies echo the traceback for debugging; set EXPOSE_TRACEBACKS=0 in production
+_EXPOSE_TRACEBACKS = os.environ.get("EXPOSE_TRACEBACKS", "1") != "0"
+
+def _error_content(message: str, tb: str, questions) -> dict:
+    """Body for a 500 response, including the traceback unless disabled."""
+    content = {"status": "error", "message": message}
+    if _EXPOSE_TRACEBACKS:
+        content["traceback"] = tb
+    content["questions"] = questions
+    return content
+
+_MISSING = object()
+
+def _raw(task_output):
+    """Content of a crew task output, trying each attribute name CrewAI has used.
+
+    Falls back to str(task_output) if none of them exist.
+    """
+    for name in ('raw_output', 'raw', 'output'):
+        value = getattr(task_output, name, _MISSING)
+        if value is not _MISSING:
+            return value
+    return str(task_output)
+
+# Canned fallback questions, built once at import
+_PY_QS = (
+    "Explain the key features of Python that make it popular for beginners.",
+    "How does Python handle variable declarations differently from languages like Java or C++?",
+    "Describe the difference between lists and tuples in Python.",
+    "What are Python modules and packages? How do they help with code organization?",
+    "Explain how exception handling works in Python with try/except blocks."
+)
+
+_ML_QS = (
+    "What is machine learning and how does it differ from traditional programming?",
+    "Explain the difference between supervised and unsupervised learning.",
+    "What is the purpose of splitting data into training and test sets?",
+    "Describe the concept of overfitting and how to prevent it.",
+    "What are some common evaluation metrics for machine learning models?"
+)
+
+_NEURAL_QS = (
+    "Explain the basic structure of a neural network.",
+    "What is the role of activation functions in neural networks?",
+    "How do convolutional neural networks (CNNs) differ from regular neural networks?",
+    "What is backpropagation and why is it important for training neural networks?",
+    "Describe the concept of transfer learning in deep learning."
+)
+
+_DATA_QS = (
+    "What are the key steps in a typical data analysis workflow?",
+    "Explain the difference between descriptive and inferential statistics.",
+    "How do you handle missing data in a dataset?",
+    "What is feature engineering and why is it important?",
+    "Describe different visualization techniques and when you would use each one."
+)
+
+# Topic-agnostic questions returned alongside error responses
+_GENERIC_QS = (
+    "What are the fundamental concepts covered in this lecture?",
+    "How do these concepts relate to real-world applications?",
+    "Can you explain the key methodologies discussed?",
+    "What are the main challenges in implementing these concepts?",
+    "How does this topic connect with other areas of the course?"
+)
+
+# Pre-serialized copies for the mock crew, whose task output is JSON text
+_PY_QS_JSON = orjson.dumps(_PY_QS).decode()
+_ML_QS_JSON = orjson.dumps(_ML_QS).decode()
+_NEURAL_QS_JSON = orjson.dumps(_NEURAL_QS).decode()
+_DATA_QS_JSON = orjson.dumps(_DATA_QS).decode()
+
+# Topic buckets in priority order: (topic, lecture keyword, course keyword)
+_TOPIC_TOKENS = (
+    ("python", "python", "python"),
+    ("ml", "machine learning", "machine learning"),
+    ("neural", "neural", "deep learning"),
+    ("data", "data", "analytics"),
+)
+
+_TOPIC_QS = {"python": _PY_QS, "ml": _ML_QS, "neural": _NEURAL_QS, "data": _DATA_QS}
+_TOPIC_QS_JSON = {"python": _PY_QS_JSON, "ml": _ML_QS_JSON, "neural": _NEURAL_QS_JSON, "data": _DATA_QS_JSON}
+
+def _question_topic(lecture_lower: str, course_lower: str) -> str | None:
+    """Topic bucket for a lecture/course pair, or None if nothing matches."""
+    for topic, lecture_kw, course_kw in _TOPIC_TOKENS:
+        if lecture_kw in lecture_lower or course_kw in course_lower:
+            return topic
+    return None
+
+# Answer-analysis buckets in priority order:
+# (topic, question keyword, lecture keyword, course keyword or None)
+_ANSWER_TOPIC_TOKENS = (
+    ("python", "python", "python", None),
+    ("ml", "machine learning", "machine learning", "machine learning"),
+    ("neural", "neural", "deep learning", "deep learning"),
+    ("data", "data", "analytics", "analytics"),
+)
+
+def _lecture_answer_topic(lecture_lower: str, course_lower: str) -> int:
+    """Index of the first answer bucket matched by lecture/course alone.
+
+    Returns len(_ANSWER_TOPIC_TOKENS) when none match. The result only depends
+    on the lecture and course, so batch callers compute it once.
+    """
+    for i, (_, _, lecture_kw, course_kw) in enumerate(_ANSWER_TOPIC_TOKENS):
+        if lecture_kw in lecture_lower or (course_kw is not None and course_kw in course_lower):
+            return i
+    return len(_ANSWER_TOPIC_TOKENS)
+
+def _answer_topic(question_lower: str, lecture_topic: int) -> str | None:
+    """Topic bucket for a question, given the lecture's bucket index."""
+    for i in range(lecture_topic):
+        topic, question_kw, _, _ = _ANSWER_TOPIC_TOKENS[i]
+        if question_kw in question_lower:
+            return topic
+    if lecture_topic < len(_ANSWER_TOPIC_TOKENS):
+        return _ANSWER_TOPIC_TOKENS[lecture_topic][0]
+    return None
+
 # Add the correct path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
 src_dir = os.path.join(os.path.dirname(current_dir), "src")
@@ -43,7 +205,7 @@ if src_dir not in sys.path:
 
 # Import the AgentsAi class with error handling
 try:
-    from agents_ai.agents_ai.crew import AgentsAi
+    from agents_ai.agents_ai.crew import AgentsAi, get_crew
     logger.info("Successfully imported AgentsAi")
 except ImportError as e:
     logger.error(f"Error importing AgentsAi: {str(e)}")
@@ -53,6 +215,9 @@ except ImportError as e:
     class AgentsAi:
         def crew(self):
             class MockCrew:
+                def copy(self):
+                    return self
+
                 def kickoff(self, inputs):
                     class MockResult:
                         class MockTaskOutput:
@@ -68,57 +233,61 @@ except ImportError as e:
                         
                         def generate_questions(self, lecture_title, course_name):
                             # This method creates custom questions based on the lecture and course
-                            if "python" in lecture_title.lower() or "python" in course_name.lower():
-                                return json.dumps([
-                                    "Explain the key features of Python that make it popular for beginners.",
-                                    "How does Python handle variable declarations differently from languages like Java or C++?",
-                                    "Describe the difference between lists and tuples in Python.",
-                                    "What are Python modules and packages? How do they help with code organization?",
-                                    "Explain how exception handling works in Python with try/except blocks."
-                                ])
-                            elif "machine learning" in lecture_title.lower() or "machine learning" in course_name.lower():
-                                return json.dumps([
-                                    "What is machine learning and how does it differ from traditional programming?",
-                                    "Explain the difference between supervised and unsupervised learning.",
-                                    "What is the purpose of splitting data into training and test sets?",
-                                    "Describe the concept of overfitting and how to prevent it.",
-                                    "What are some common evaluation metrics for machine learning models?"
-                                ])
-                            elif "neural" in lecture_title.lower() or "deep learning" in course_name.lower():
-                                return json.dumps([
-                                    "Explain the basic structure of a neural network.",
-                                    "What is the role of activation functions in neural networks?",
-                                    "How do convolutional neural networks (CNNs) differ from regular neural networks?",
-                                    "What is backpropagation and why is it important for training neural networks?",
-                                    "Describe the concept of transfer learning in deep learning."
-                                ])
-                            elif "data" in lecture_title.lower() or "analytics" in course_name.lower():
-                                return json.dumps([
-                                    "What are the key steps in a typical data analysis workflow?",
-                                    "Explain the difference between descriptive and inferential statistics.",
-                                    "How do you handle missing data in a dataset?",
-                                    "What is feature engineering and why is it important?",
-                                    "Describe different visualization techniques and when you would use each one."
-                                ])
+                            topic = _question_topic(lecture_title.lower(), course_name.lower())
+                            if topic is not None:
+                                return _TOPIC_QS_JSON[topic]
                             else:
                                 # Default questions if topic doesn't match any specific categories
-                                return json.dumps([
+                                return orjson.dumps([
                                     f"Explain the core concepts of {lecture_title}.",
                                     f"How does {lecture_title} relate to other topics in {course_name}?",
                                     f"What are the practical applications of {lecture_title}?",
                                     f"Describe the challenges students often face when learning about {lecture_title}.",
                                     f"How has the field of {lecture_title} evolved over time?"
-                                ])
+                                ]).decode()
                                 
                     return MockResult(inputs['lecture_title'], inputs['course_name'])
             return MockCrew()
+
+    @functools.lru_cache(maxsize=1)
+    def get_crew():
+        return AgentsAi().crew()
     logger.warning("Using mock AgentsAi class")
 
-@app.get("/")
+def _get_crew():
+    """Return a crew for one request.
+
+    The crew is built once per process; each request gets a copy because
+    kickoff() interpolates its inputs into the crew's tasks.
+    """
+    return get_crew().copy()
+
+# Questions generated for a (lecture_title, course_name) pair are reused for
+# QUIZ_CACHE_TTL seconds, so a repeated lecture doesn't rerun the crew
+_QUIZ_CACHE_TTL = int(os.environ.get("QUIZ_CACHE_TTL", 6 * 3600))
+_QUIZ_CACHE_MAX = 1024
+_quiz_cache = {}  # (lecture_title, course_name) -> (expires_at, questions tuple)
+
+def _quiz_cache_get(key):
+    entry = _quiz_cache.get(key)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return list(entry[1])
+
+def _quiz_cache_set(key, questions):
+    if len(_quiz_cache) >= _QUIZ_CACHE_MAX:
+        # Evict the oldest entry
+        del _quiz_cache[next(iter(_quiz_cache))]
+    _quiz_cache[key] = (time.monotonic() + _QUIZ_CACHE_TTL, tuple(questions))
+
+# The root status body never changes, so it's serialized once at import
+_ROOT_BODY = orjson.dumps({"message": "Quiz Generator API is running"})
+
+@app.get("/", response_class=Response, response_model=None)
 async def root():
-    return {"message": "Quiz Generator API is running"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
-@app.get("/test-generate-quiz")
+@app.get("/test-generate-quiz", response_class=ORJSONResponse, response_model=None)
 async def test_endpoint():
     # Test data
     test_data = {
@@ -136,7 +305,7 @@ async def test_endpoint():
         
         # Get crew instance
         try:
-            crew = AgentsAi().crew()
+            crew = await run_in_threadpool(_get_crew)
             logger.info("Successfully created crew instance")
         except Exception as crew_error:
             logger.error(f"Error creating crew: {str(crew_error)}")
@@ -145,65 +314,28 @@ async def test_endpoint():
         
         # Execute the crew process
         try:
-            result = crew.kickoff(inputs=inputs)
+            result = await run_in_threadpool(crew.kickoff, inputs=inputs)
             logger.info("Successfully executed crew process")
         except Exception as kickoff_error:
             logger.error(f"Error during kickoff: {str(kickoff_error)}")
             logger.error(traceback.format_exc())
             raise
         
-        # More detailed logging of result structure
-        logger.debug(f"Result type: {type(result).__name__}")
-        logger.debug(f"Result dir: {dir(result)}")
-        
         try:
-            logger.debug(f"Tasks output: {result.tasks_output}")
+            # More detailed logging of result structure
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Result type: {type(result).__name__}")
+                logger.debug(f"Tasks output: {result.tasks_output}")
             
-            # Access the second task's output (index 1)
-            question_task_output = result.tasks_output[1]
-            
-            # Try different ways to access the content
-            if hasattr(question_task_output, 'raw_output'):
-                raw_questions = question_task_output.raw_output
-            elif hasattr(question_task_output, 'raw'):
-                raw_questions = question_task_output.raw
-            elif hasattr(question_task_output, 'output'):
-                raw_questions = question_task_output.output
-            else:
-                # If we can't find the output, convert the whole object to string
-                raw_questions = str(question_task_output)
-                
-            logger.info(f"Raw questions: {raw_questions}")
-            
-            # Parse the JSON string
-            if isinstance(raw_questions, str):
-                # Find everything between square brackets if it's a string
-                match = re.search(r'\[(.*)\]', raw_questions, re.DOTALL)
-                if match:
-                    json_str = f"[{match.group(1)}]"
-                    questions = json.loads(json_str)
-                else:
-                    questions = json.loads(raw_questions)
-            else:
-                # Maybe it's already properly structured
-                questions = raw_questions
-                
-            logger.info(f"Parsed questions: {questions}")
+            questions, _ = _extract_questions(result, test_data["lecture_title"], test_data["course_name"])
             
         except (IndexError, KeyError, AttributeError) as e:
             logger.error(f"Error accessing tasks_output: {str(e)}")
             logger.error(f"Available attributes: {dir(result)}")
-            if hasattr(result, 'tasks_output'):
-                for i, task in enumerate(result.tasks_output):
-                    logger.error(f"Task {i+1} type: {type(task)}")
-                    logger.error(f"Task {i+1} dir: {dir(task)}")
-            raise
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {str(e)}")
-            logger.error(f"Raw content: {raw_questions}")
+            _log_task_outputs(result)
             raise
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -213,25 +345,21 @@ async def test_endpoint():
         
     except Exception as e:
         logger.error(f"Test failed: {str(e)}")
-        logger.error(traceback.format_exc())
-        return JSONResponse(
+        tb = traceback.format_exc()
+        logger.error(tb)
+        return ORJSONResponse(
             status_code=500,
-            content={
-                "status": "error",
-                "message": f"Test generation failed: {str(e)}",
-                "traceback": traceback.format_exc(),
-                "questions": [
-                    "What are the fundamental concepts covered in this lecture?",
-                    "How do these concepts relate to real-world applications?",
-                    "Can you explain the key methodologies discussed?",
-                    "What are the main challenges in implementing these concepts?",
-                    "How does this topic connect with other areas of the course?"
-                ]
-            }
+            content=_error_content(f"Test generation failed: {str(e)}", tb, _GENERIC_QS)
         )    
 
-@app.post("/generate-quiz")
-async def generate_quiz(request: LectureRequest):
+@app.post("/generate-quiz", response_class=ORJSONResponse, response_model=None)
+async def generate_quiz(http_request: Request):
+    # Decode and validate the body with msgspec rather than pydantic
+    try:
+        request = msgspec.json.decode(await http_request.body(), type=LectureRequest)
+    except msgspec.DecodeError as e:
+        return _invalid_body(e)
+
     try:
         inputs = {
             'lecture_title': request.lecture_title,
@@ -240,110 +368,57 @@ async def generate_quiz(request: LectureRequest):
         
         logger.info(f"Processing request with inputs: {inputs}")
         
+        cache_key = (request.lecture_title, request.course_name)
+        questions = _quiz_cache_get(cache_key)
+        if questions is not None:
+            return ORJSONResponse(
+                status_code=200,
+                content={
+                    "status": "success",
+                    "questions": questions
+                }
+            )
+        
         # Get crew instance - with error handling
         try:
-            crew = AgentsAi().crew()
+            crew = await run_in_threadpool(_get_crew)
             logger.info("Successfully created crew instance")
         except Exception as crew_error:
             error_msg = f"Error creating crew: {str(crew_error)}"
             logger.error(error_msg)
-            logger.error(traceback.format_exc())
-            return JSONResponse(
+            tb = traceback.format_exc()
+            logger.error(tb)
+            return ORJSONResponse(
                 status_code=500,
-                content={
-                    "status": "error",
-                    "message": error_msg,
-                    "traceback": traceback.format_exc(),
-                    "questions": [
-                        "What are the fundamental concepts covered in this lecture?",
-                        "How do these concepts relate to real-world applications?",
-                        "Can you explain the key methodologies discussed?",
-                        "What are the main challenges in implementing these concepts?",
-                        "How does this topic connect with other areas of the course?"
-                    ]
-                }
+                content=_error_content(error_msg, tb, _GENERIC_QS)
             )
         
         # Execute the crew process - with error handling
         try:
-            result = crew.kickoff(inputs=inputs)
+            result = await run_in_threadpool(crew.kickoff, inputs=inputs)
             logger.info("Successfully executed crew process")
         except Exception as kickoff_error:
             error_msg = f"Error during kickoff: {str(kickoff_error)}"
             logger.error(error_msg)
-            logger.error(traceback.format_exc())
-            return JSONResponse(
+            tb = traceback.format_exc()
+            logger.error(tb)
+            return ORJSONResponse(
                 status_code=500,
-                content={
-                    "status": "error",
-                    "message": error_msg,
-                    "traceback": traceback.format_exc(),
-                    "questions": [
-                        "What are the fundamental concepts covered in this lecture?",
-                        "How do these concepts relate to real-world applications?",
-                        "Can you explain the key methodologies discussed?",
-                        "What are the main challenges in implementing these concepts?",
-                        "How does this topic connect with other areas of the course?"
-                    ]
-                }
+                content=_error_content(error_msg, tb, _GENERIC_QS)
             )
         
         # Extract questions from the nested structure
         try:
-            # Access the second task's output (index 1)
-            question_task_output = result.tasks_output[1]
-            
-            # Try different ways to access the content
-            if hasattr(question_task_output, 'raw_output'):
-                raw_questions = question_task_output.raw_output
-            elif hasattr(question_task_output, 'raw'):
-                raw_questions = question_task_output.raw
-            elif hasattr(question_task_output, 'output'):
-                raw_questions = question_task_output.output
-            else:
-                # If we can't find the output, convert the whole object to string
-                raw_questions = str(question_task_output)
-                
-            logger.info(f"Raw questions: {raw_questions}")
-            
-            # Parse the JSON string
-            try:
-                if isinstance(raw_questions, str):
-                    # Find everything between square brackets if it's a string
-                    match = re.search(r'\[(.*)\]', raw_questions, re.DOTALL)
-                    if match:
-                        json_str = f"[{match.group(1)}]"
-                        questions = json.loads(json_str)
-                    else:
-                        questions = json.loads(raw_questions)
-                else:
-                    # Maybe it's already properly structured
-                    questions = raw_questions
-                    
-                logger.info(f"Parsed questions: {questions}")
-            except json.JSONDecodeError as je:
-                logger.error(f"JSON decode error: {str(je)}")
-                # Try to clean the string more aggressively
-                try:
-                    # Extract anything that looks like a JSON array
-                    text = re.sub(r'.*?\[(.*)\].*', r'[\1]', raw_questions, flags=re.DOTALL)
-                    questions = json.loads(text)
-                except Exception:
-                    logger.error(f"Failed to parse JSON even after cleanup: {raw_questions}")
-                    # Generate topic-specific questions as a fallback
-                    questions = generate_topic_specific_questions(request.lecture_title, request.course_name)
+            questions, used_fallback = _extract_questions(result, request.lecture_title, request.course_name)
         except (AttributeError, IndexError) as e:
             logger.error(f"Error accessing tasks_output: {str(e)}")
-            if hasattr(result, 'tasks_output'):
-                for i, task in enumerate(result.tasks_output):
-                    logger.error(f"Task {i+1} type: {type(task)}")
-                    logger.error(f"Task {i+1} dir: {dir(task)}")
+            _log_task_outputs(result)
             
             # Generate topic-specific questions as a fallback
             questions = generate_topic_specific_questions(request.lecture_title, request.course_name)
             
             # Return with warning but don't fail
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=200,
                 content={
                     "status": "warning",
@@ -352,7 +427,12 @@ async def generate_quiz(request: LectureRequest):
                 }
             )
         
-        return JSONResponse(
+        # Cache only what the crew produced, not the canned fallback, so a
+        # failed parse is retried on the next request
+        if isinstance(questions, list) and not used_fallback:
+            _quiz_cache_set(cache_key, questions)
+        
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -362,83 +442,130 @@ async def generate_quiz(request: LectureRequest):
         
     except Exception as e:
         logger.error(f"Error generating quiz: {str(e)}")
-        logger.error(traceback.format_exc())
+        tb = traceback.format_exc()
+        logger.error(tb)
         
         # Generate topic-specific questions as a fallback
         questions = generate_topic_specific_questions(request.lecture_title, request.course_name)
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
-            content={
-                "status": "error",
-                "message": f"Failed to generate questions: {str(e)}",
-                "traceback": traceback.format_exc(),
-                "questions": questions
-            }
+            content=_error_content(f"Failed to generate questions: {str(e)}", tb, questions)
         )
 
+def _extract_questions(result, lecture_title, course_name):
+    """Parse the question list out of a crew result.
+
+    Tries the question task's output as JSON first, then the bracketed array
+    inside it, and finally falls back to topic-specific questions. Returns
+    ``(questions, used_fallback)``. Raises AttributeError/IndexError if the
+    result has no question task output.
+    """
+    # Access the second task's output (index 1)
+    raw_questions = _raw(result.tasks_output[1])
+    
+    logger.info(f"Raw questions: {raw_questions}")
+    
+    if not isinstance(raw_questions, str):
+        # Maybe it's already properly structured
+        return raw_questions, False
+    
+    # Parse the JSON string
+    try:
+        # Fast path: the output is usually already a bare JSON array
+        try:
+            questions = orjson.loads(raw_questions)
+            parsed = isinstance(questions, list)
+        except orjson.JSONDecodeError:
+            parsed = False
+        if not parsed:
+            # Find everything between square brackets
+            match = _BRACKETS_RE.search(raw_questions)
+            if match:
+                json_str = f"[{match.group(1)}]"
+                questions = orjson.loads(json_str)
+            else:
+                questions = orjson.loads(raw_questions)
+    except orjson.JSONDecodeError as je:
+        logger.error(f"JSON decode error: {str(je)}")
+        # Try to clean the string more aggressively
+        try:
+            # Extract anything that looks like a JSON array
+            text = _BRACKETS_SUB_RE.sub(r'[\1]', raw_questions)
+            questions = orjson.loads(text)
+        except Exception:
+            logger.error(f"Failed to parse JSON even after cleanup: {raw_questions}")
+            # Generate topic-specific questions as a fallback
+            return generate_topic_specific_questions(lecture_title, course_name), True
+    
+    logger.info(f"Parsed questions: {questions}")
+    return questions, False
+
+def _log_task_outputs(result):
+    """Log the type and attributes of each task output, for debugging."""
+    if hasattr(result, 'tasks_output'):
+        for i, task in enumerate(result.tasks_output):
+            logger.error(f"Task {i+1} type: {type(task)}")
+            logger.error(f"Task {i+1} dir: {dir(task)}")
+
 def generate_topic_specific_questions(lecture_title, course_name):
     """Generate topic-specific questions based on lecture title and course name."""
+    return list(_topic_specific_questions(lecture_title, course_name))
+
+@functools.lru_cache(maxsize=256)
+def _topic_specific_questions(lecture_title, course_name):
+    """Cached worker for generate_topic_specific_questions; returns an immutable tuple."""
     lecture_title = lecture_title.lower()
     course_name = course_name.lower()
     
-    if "python" in lecture_title or "python" in course_name:
-        return [
-            "Explain the key features of Python that make it popular for beginners.",
-            "How does Python handle variable declarations differently from languages like Java or C++?",
-            "Describe the difference between lists and tuples in Python.",
-            "What are Python modules and packages? How do they help with code organization?",
-            "Explain how exception handling works in Python with try/except blocks."
-        ]
-    elif "machine learning" in lecture_title or "machine learning" in course_name:
-        return [
-            "What is machine learning and how does it (ABOOD) from traditional programming?",
-            "Explain the difference between supervised and unsupervised learning.",
-            "What is the purpose of splitting data into training and test sets?",
-            "Describe the concept of overfitting and how to prevent it.",
-            "What are some common evaluation metrics for machine learning models?"
-        ]
-    elif "neural" in lecture_title or "deep learning" in course_name:
-        return [
-            "Explain the basic structure of a neural network.",
-            "What is the role of activation functions in neural networks?",
-            "How do convolutional neural networks (CNNs) differ from regular neural networks?",
-            "What is backpropagation and why is it important for training neural networks?",
-            "Describe the concept of transfer learning in deep learning."
-        ]
-    elif "data" in lecture_title or "analytics" in course_name:
-        return [
-            "What are the key steps in a typical data analysis workflow?",
-            "Explain the difference between descriptive and inferential statistics.",
-            "How do you handle missing data in a dataset?",
-            "What is feature engineering and why is it important?",
-            "Describe different visualization techniques and when you would use each one."
-        ]
+    topic = _question_topic(lecture_title, course_name)
+    if topic is not None:
+        return _TOPIC_QS[topic]
     else:
         # Default questions if topic doesn't match any specific categories
-        return [
+        return (
             f"Explain the core concepts of {lecture_title}.",
             f"How does {lecture_title} relate to other topics in {course_name}?",
             f"What are the practical applications of {lecture_title}?",
             f"Describe the challenges students often face when learning about {lecture_title}.",
             f"How has the field of {lecture_title} evolved over time?"
-        ]
+        )
     
 
-class AnswerRequest(BaseModel):
+# Above this many answers, analysis runs in the threadpool instead of inline
+_INLINE_ANALYSIS_MAX = 20
+
+class AnswerRequest(msgspec.Struct, gc=False):
     lecture_title: str
     course_name: str
     questions: list[str]
     answers: list[str]
 
-@app.post("/analyze-answers")
-async def analyze_answers(request: AnswerRequest):
+@dataclass(slots=True)
+class AnswerResult:
+    """Analysis of one answer; orjson serializes dataclasses natively."""
+    is_correct: bool
+    score: int
+    feedback: str
+    question: str
+    answer: str
+    matched_keywords: int = 0
+    expected_keywords_count: int = 0
+
+@app.post("/analyze-answers", response_class=ORJSONResponse, response_model=None)
+async def analyze_answers(http_request: Request):
+    # Decode and validate the body with msgspec rather than pydantic
+    try:
+        request = msgspec.json.decode(await http_request.body(), type=AnswerRequest)
+    except msgspec.DecodeError as e:
+        return _invalid_body(e)
+
     try:
         logger.info(f"Analyzing answers for lecture: {request.lecture_title}")
         
         # Input validation
         if len(request.questions) != len(request.answers):
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={
                     "status": "error",
@@ -447,18 +574,20 @@ async def analyze_answers(request: AnswerRequest):
                 }
             )
         
-        # Analyze each answer using the analysis function
-        results = []
-        for i, (question, answer) in enumerate(zip(request.questions, request.answers)):
-            analysis = analyze_student_answer(question, answer, request.lecture_title, request.course_name)
-            results.append(analysis)
+        # Analyze each answer using the analysis function; large batches go to
+        # a worker thread so they don't hold up the event loop
+        args = (request.questions, request.answers, request.lecture_title, request.course_name)
+        if len(request.questions) > _INLINE_ANALYSIS_MAX:
+            results = await run_in_threadpool(analyze_all_answers, *args)
+        else:
+            results = analyze_all_answers(*args)
         
         # Calculate overall score
-        correct_count = sum(1 for result in results if result["is_correct"])
+        correct_count = sum(1 for result in results if result.is_correct)
         total_count = len(results)
         overall_score = (correct_count / total_count) * 100 if total_count > 0 else 0
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,
             content={
                 "status": "success",
@@ -471,7 +600,7 @@ async def analyze_answers(request: AnswerRequest):
         logger.error(f"Error analyzing answers: {str(e)}")
         logger.error(traceback.format_exc())
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "status": "error",
@@ -480,22 +609,92 @@ async def analyze_answers(request: AnswerRequest):
             }
         )
 
-def analyze_student_answer(question: str, answer: str, lecture_title: str, course_name: str) -> dict:
+# Expected answer keywords per question type, used by analyze_student_answer
+_EXPECTED_KEYWORDS = {
+    "python_features": ("readability", "easy", "simple", "libraries", "versatile", "interpreted"),
+    "python_variables": ("dynamic", "typing", "declaration", "assignment", "type"),
+    "python_lists_tuples": ("mutable", "immutable", "parentheses", "brackets", "modify"),
+    "python_modules": ("import", "organization", "reuse", "namespace", "library"),
+    "python_exceptions": ("try", "except", "catch", "handle", "error", "finally"),
+    "ml_vs_traditional": ("data", "patterns", "algorithm", "explicit", "programming", "learn"),
+    "ml_supervised": ("labeled", "unlabeled", "target", "classification", "clustering"),
+    "ml_train_test": ("generalization", "validation", "overfitting", "performance", "evaluate"),
+    "ml_overfitting": ("regularization", "validation", "generalize", "complex", "flexible"),
+    "ml_metrics": ("accuracy", "precision", "recall", "f1", "auc", "roc"),
+    "nn_structure": ("input", "hidden", "output", "layer", "weight", "bias", "neuron"),
+    "nn_activation": ("relu", "sigmoid", "tanh", "non-linear", "function"),
+    "nn_cnn": ("filter", "kernel", "convolution", "pooling", "feature", "image"),
+    "nn_backprop": ("gradient", "descent", "error", "weight", "update", "learning"),
+    "nn_transfer": ("pretrained", "model", "feature", "extraction", "fine-tuning"),
+    "data_workflow": ("collection", "cleaning", "exploration", "analysis", "visualization", "interpretation"),
+    "data_statistics": ("summarize", "population", "sample", "hypothesis", "testing", "inference"),
+    "data_missing": ("imputation", "deletion", "mean", "median", "mode", "regression"),
+    "data_features": ("transformation", "selection", "creation", "normalization", "scaling"),
+    "data_visualization": ("chart", "graph", "plot", "dashboard", "histogram", "scatter"),
+}
+
+def _build_automaton(keywords):
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+# One Aho-Corasick automaton per keyword set, so each answer is scanned once
+_AUTOMATA = {name: _build_automaton(kws) for name, kws in _EXPECTED_KEYWORDS.items()} if ahocorasick else {}
+
+def _count_keyword_matches(keywords, answer_lower, automaton=None) -> int:
+    """Count how many distinct keywords occur as substrings of answer_lower."""
+    if automaton is not None:
+        return len({keyword for _, keyword in automaton.iter(answer_lower)})
+    return sum(1 for keyword in keywords if keyword in answer_lower)
+
+# Question words that don't count as key terms for generic questions
+_QUESTION_STOPWORDS = frozenset({"what", "explain", "describe", "discuss", "how", "when", "where", "which", "this", "that", "these", "those"})
+
+def _lecture_tokens(lecture_lower: str) -> frozenset[str]:
+    """Meaningful (longer than 3 characters) terms of a lowercased lecture title."""
+    return frozenset(term for term in lecture_lower.split() if len(term) > 3)
+
+def analyze_all_answers(questions: list[str], answers: list[str], lecture_title: str, course_name: str) -> list[AnswerResult]:
+    """Analyze each question/answer pair with analyze_student_answer.
+
+    Work that only depends on the lecture and course is done once for the
+    whole batch rather than once per answer.
+    """
+    lecture_lower = lecture_title.lower()
+    course_lower = course_name.lower()
+    lecture_topic = _lecture_answer_topic(lecture_lower, course_lower)
+    lecture_tokens = _lecture_tokens(lecture_lower)
+    return [
+        analyze_student_answer(question, answer, lecture_title, course_name,
+                               lecture_lower=lecture_lower, course_lower=course_lower,
+                               lecture_topic=lecture_topic, lecture_tokens=lecture_tokens)
+        for question, answer in zip(questions, answers)
+    ]
+
+def analyze_student_answer(question: str, answer: str, lecture_title: str, course_name: str,
+                           lecture_lower: str | None = None, course_lower: str | None = None,
+                           lecture_topic: int | None = None,
+                           lecture_tokens: frozenset[str] | None = None) -> AnswerResult:
     """
     Analyze a student's answer to determine if it's correct and provide feedback.
     
     This is a simplified version - in a real implementation, you would use an AI model 
     to evaluate the answer against expected keywords or concepts.
+
+    Batch callers can pass lecture_lower/course_lower/lecture_topic/lecture_tokens
+    precomputed.
     """
     # Skip empty answers
     if not answer or answer.strip() == "":
-        return {
-            "is_correct": False,
-            "score": 0,
-            "feedback": "No answer provided. Please try to answer the question.",
-            "question": question,
-            "answer": answer
-        }
+        return AnswerResult(
+            is_correct=False,
+            score=0,
+            feedback="No answer provided. Please try to answer the question.",
+            question=question,
+            answer=answer
+        )
     
     # Simplified analysis based on keywords in the answer
     # In a real implementation, you would use AI to evaluate the quality of the answer
@@ -503,80 +702,88 @@ def analyze_student_answer(question: str, answer: str, lecture_title: str, cours
     # Convert to lowercase for easier comparison
     question_lower = question.lower()
     answer_lower = answer.lower()
-    lecture_lower = lecture_title.lower()
-    course_lower = course_name.lower()
+    if lecture_lower is None:
+        lecture_lower = lecture_title.lower()
+    if course_lower is None:
+        course_lower = course_name.lower()
+    if lecture_topic is None:
+        lecture_topic = _lecture_answer_topic(lecture_lower, course_lower)
+    topic = _answer_topic(question_lower, lecture_topic)
     
-    # Extract expected keywords based on the question type
-    expected_keywords = []
+    # Pick the expected keyword set based on the question type
+    keyword_set = None
+    expected_keywords = ()
     
     # Python-related questions
-    if "python" in question_lower or "python" in lecture_lower:
+    if topic == "python":
         if "feature" in question_lower or "popular" in question_lower:
-            expected_keywords = ["readability", "easy", "simple", "libraries", "versatile", "interpreted"]
+            keyword_set = "python_features"
         elif "variable" in question_lower:
-            expected_keywords = ["dynamic", "typing", "declaration", "assignment", "type"]
+            keyword_set = "python_variables"
         elif "list" in question_lower and "tuple" in question_lower:
-            expected_keywords = ["mutable", "immutable", "parentheses", "brackets", "modify"]
+            keyword_set = "python_lists_tuples"
         elif "module" in question_lower or "package" in question_lower:
-            expected_keywords = ["import", "organization", "reuse", "namespace", "library"]
+            keyword_set = "python_modules"
         elif "exception" in question_lower:
-            expected_keywords = ["try", "except", "catch", "handle", "error", "finally"]
+            keyword_set = "python_exceptions"
     
     # Machine Learning-related questions
-    elif "machine learning" in question_lower or "machine learning" in lecture_lower or "machine learning" in course_lower:
+    elif topic == "ml":
         if "differ" in question_lower or "traditional" in question_lower:
-            expected_keywords = ["data", "patterns", "algorithm", "explicit", "programming", "learn"]
+            keyword_set = "ml_vs_traditional"
         elif "supervised" in question_lower and "unsupervised" in question_lower:
-            expected_keywords = ["labeled", "unlabeled", "target", "classification", "clustering"]
+            keyword_set = "ml_supervised"
         elif "training" in question_lower and "test" in question_lower:
-            expected_keywords = ["generalization", "validation", "overfitting", "performance", "evaluate"]
+            keyword_set = "ml_train_test"
         elif "overfitting" in question_lower:
-            expected_keywords = ["regularization", "validation", "generalize", "complex", "flexible"]
+            keyword_set = "ml_overfitting"
         elif "evaluation" in question_lower or "metric" in question_lower:
-            expected_keywords = ["accuracy", "precision", "recall", "f1", "auc", "roc"]
+            keyword_set = "ml_metrics"
             
     # Neural Network-related questions
-    elif "neural" in question_lower or "deep learning" in lecture_lower or "deep learning" in course_lower:
+    elif topic == "neural":
         if "basic structure" in question_lower or "structure" in question_lower:
-            expected_keywords = ["input", "hidden", "output", "layer", "weight", "bias", "neuron"]
+            keyword_set = "nn_structure"
         elif "activation" in question_lower:
-            expected_keywords = ["relu", "sigmoid", "tanh", "non-linear", "function"]
+            keyword_set = "nn_activation"
         elif "cnn" in question_lower or "convolutional" in question_lower:
-            expected_keywords = ["filter", "kernel", "convolution", "pooling", "feature", "image"]
+            keyword_set = "nn_cnn"
         elif "backpropagation" in question_lower:
-            expected_keywords = ["gradient", "descent", "error", "weight", "update", "learning"]
+            keyword_set = "nn_backprop"
         elif "transfer" in question_lower:
-            expected_keywords = ["pretrained", "model", "feature", "extraction", "fine-tuning"]
+            keyword_set = "nn_transfer"
     
     # Data Analysis-related questions
-    elif "data" in question_lower or "analytics" in lecture_lower or "analytics" in course_lower:
+    elif topic == "data":
         if "workflow" in question_lower or "steps" in question_lower:
-            expected_keywords = ["collection", "cleaning", "exploration", "analysis", "visualization", "interpretation"]
+            keyword_set = "data_workflow"
         elif "descriptive" in question_lower and "inferential" in question_lower:
-            expected_keywords = ["summarize", "population", "sample", "hypothesis", "testing", "inference"]
+            keyword_set = "data_statistics"
         elif "missing" in question_lower:
-            expected_keywords = ["imputation", "deletion", "mean", "median", "mode", "regression"]
+            keyword_set = "data_missing"
         elif "feature" in question_lower and "engineering" in question_lower:
-            expected_keywords = ["transformation", "selection", "creation", "normalization", "scaling"]
+            keyword_set = "data_features"
         elif "visualization" in question_lower:
-            expected_keywords = ["chart", "graph", "plot", "dashboard", "histogram", "scatter"]
+            keyword_set = "data_visualization"
             
     # Generic questions - look for topic-specific keywords
     else:
         # Extract key terms from the question and lecture title
-        key_terms = set()
-        for term in lecture_lower.split():
-            if len(term) > 3:  # Only consider meaningful terms
-                key_terms.add(term)
+        if lecture_tokens is None:
+            lecture_tokens = _lecture_tokens(lecture_lower)
+        key_terms = set(lecture_tokens)
         
         for term in question_lower.split():
-            if len(term) > 3 and term not in ["what", "explain", "describe", "discuss", "how", "when", "where", "which", "this", "that", "these", "those"]:
+            if len(term) > 3 and term not in _QUESTION_STOPWORDS:
                 key_terms.add(term)
         
-        expected_keywords = list(key_terms)
-    
+        expected_keywords = tuple(key_terms)
+
+    if keyword_set is not None:
+        expected_keywords = _EXPECTED_KEYWORDS[keyword_set]
+
     # Count how many expected keywords are in the answer
-    keyword_matches = sum(1 for keyword in expected_keywords if keyword in answer_lower)
+    keyword_matches = _count_keyword_matches(expected_keywords, answer_lower, _AUTOMATA.get(keyword_set))
     
     # Check minimum answer length (at least 50 characters for a proper answer)
     min_length = 50
@@ -612,43 +819,45 @@ def analyze_student_answer(question: str, answer: str, lecture_title: str, cours
     else:
         feedback = "Your answer needs improvement. Try to include more specific details about key concepts."
     
-    return {
-        "is_correct": is_correct,
-        "score": score,
-        "feedback": feedback,
-        "question": question,
-        "answer": answer,
-        "matched_keywords": keyword_matches,
-        "expected_keywords_count": len(expected_keywords)
-    }    
+    return AnswerResult(
+        is_correct=is_correct,
+        score=score,
+        feedback=feedback,
+        question=question,
+        answer=answer,
+        matched_keywords=keyword_matches,
+        expected_keywords_count=len(expected_keywords)
+    )
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global exception handler caught: {str(exc)}")
-    logger.error(traceback.format_exc())
+    tb = traceback.format_exc()
+    logger.error(tb)
     
-    # Try to extract lecture_title and course_name from the request
-    try:
-        body = await request.json()
-        lecture_title = body.get("lecture_title", "Unknown Topic")
-        course_name = body.get("course_name", "General Course")
-    except:
-        lecture_title = "Unknown Topic"
-        course_name = "General Course"
-    
-    # Generate topic-specific questions as a fallback
-    questions = generate_topic_specific_questions(lecture_title, course_name)
+    # Starlette passes catch-all handlers a Request with no receive channel,
+    # so the body can't be read here. Use the generic topic; its questions
+    # come from the memoized canned set, so nothing here blocks the loop.
+    questions = generate_topic_specific_questions("Unknown Topic", "General Course")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
-        content={
-            "status": "error",
-            "message": f"Internal server error: {str(exc)}",
-            "traceback": traceback.format_exc(),
-            "questions": questions
-        }
+        content=_error_content(f"Internal server error: {str(exc)}", tb, questions)
     )
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, timeout_keep_alive=60)
\ No newline at end of file
+    # Workers need the app as an import string. The default "auto" loop
+    # already uses uvloop where it's installed (it doesn't support Windows).
+    workers = int(os.environ.get("WEB_CONCURRENCY", max(2, os.cpu_count() or 1)))
+    uvicorn.run(
+        "main:app" if workers > 1 else app,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host="0.0.0.0",
+        port=8000,
+        http="httptools",
+        workers=workers,
+        limit_concurrency=int(os.environ.get("LIMIT_CONCURRENCY", 1000)),
+        timeout_keep_alive=60,
+        access_log=os.environ.get("ACCESS_LOG", "0") == "1"
+    )
\ No newline at end of file
@@ -15,6 +15,21 @@ logger = logging.getLogger(__name__)
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.dirname(current_dir))
 
+_DECODER = json.JSONDecoder()
+
+def _parse_questions(raw_questions):
+    """Decode the first JSON array in raw_questions.
+
+    Decoding starts at the first '[' and stops where that array ends, so
+    prose around it is skipped in one pass without copying the string.
+    Without a '[' the whole string is decoded.
+    """
+    start = raw_questions.find('[')
+    if start == -1:
+        return json.loads(raw_questions)
+    questions, _ = _DECODER.raw_decode(raw_questions, start)
+    return questions
+
 def test_crew():
     logger.info("Testing CrewAI setup...")
     
@@ -73,14 +88,7 @@ def test_crew():
             # Try to parse as JSON, with a fallback
             try:
                 if isinstance(raw_questions, str):
-                    # Find everything between square brackets if it's a string
-                    import re
-                    match = re.search(r'\[(.*)\]', raw_questions, re.DOTALL)
-                    if match:
-                        json_str = f"[{match.group(1)}]"
-                        questions = json.loads(json_str)
-                    else:
-                        questions = json.loads(raw_questions)
+                    questions = _parse_questions(raw_questions)
                 else:
                     # Maybe it's already properly structured
                     questions = raw_questions